@@ -64,7 +64,7 @@ def get_install_requires():
         "websocket-client",
         "peewee",
         "pymysql",
-        "mongoengine",
+        "pymongo",
         "numpy",
         "pandas",
         "matplotlib",
@@ -0,0 +1,362 @@
+"""
+Tests of the MongoDB database manager.
+
+TestMongoManager runs against the MongoDB server given by
+VNPY_TEST_MONGODB_URI (default localhost), and is skipped if no server
+is reachable. Document conversion tests need no server.
+"""
+
+import os
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+os.environ.setdefault("VNPY_TESTING", "1")
+
+import numpy as np  # noqa: E402
+from pymongo import MongoClient  # noqa: E402
+from pymongo.errors import PyMongoError  # noqa: E402
+
+from vnpy.trader.constant import Exchange, Interval  # noqa: E402
+from vnpy.trader.database import database_mongo  # noqa: E402
+from vnpy.trader.database.database_mongo import MongoManager  # noqa: E402
+from vnpy.trader.object import BarData, TickData  # noqa: E402
+
+MONGODB_URI = os.environ.get("VNPY_TEST_MONGODB_URI", "mongodb://localhost:27017")
+DATABASE_NAME = "vnpy_test_database_mongo"
+
+
+class TestToBar(unittest.TestCase):
+
+    def setUp(self):
+        self.document = {
+            "symbol": "rb2005",
+            "exchange": "SHFE",
+            "interval": "1m",
+            "datetime": datetime(2020, 1, 2, 9, 0),
+            "volume": 10.0,
+            "open_interest": 1000.0,
+            "open_price": 3500.0,
+            "high_price": 3510.0,
+            "low_price": 3490.0,
+            "close_price": 3505.0,
+        }
+        self.bar = BarData(
+            symbol="rb2005",
+            exchange=Exchange.SHFE,
+            datetime=datetime(2020, 1, 2, 9, 0),
+            interval=Interval.MINUTE,
+            volume=10.0,
+            open_interest=1000.0,
+            open_price=3500.0,
+            high_price=3510.0,
+            low_price=3490.0,
+            close_price=3505.0,
+            gateway_name="DB",
+        )
+
+    def test_fast_path_enabled(self):
+        self.assertTrue(database_mongo.FAST_TO_BAR)
+
+    def test_to_bar(self):
+        for fast in (True, False):
+            with self.subTest(fast=fast), \
+                    mock.patch.object(database_mongo, "FAST_TO_BAR", fast):
+                bar = database_mongo.to_bar(self.document)
+
+                self.assertEqual(bar, self.bar)
+                self.assertEqual(bar.vt_symbol, self.bar.vt_symbol)
+                self.assertEqual(bar.__dict__, self.bar.__dict__)
+
+    def test_from_bar_round_trip(self):
+        d = database_mongo.from_bar(self.bar)
+        self.assertEqual(database_mongo.to_bar(d), self.bar)
+
+
+class TestMongoManager(unittest.TestCase):
+
+    def setUp(self):
+        # one connection only, so unacknowledged writes are applied before
+        # the following read on the same socket
+        self.client = MongoClient(
+            MONGODB_URI, maxPoolSize=1, serverSelectionTimeoutMS=1000
+        )
+        try:
+            self.client.admin.command("ping")
+        except PyMongoError:
+            self.client.close()
+            self.skipTest(f"MongoDB is not available at {MONGODB_URI}")
+
+        self.client.drop_database(DATABASE_NAME)
+        self.manager = MongoManager(self.client[DATABASE_NAME])
+        self.start = datetime(2020, 1, 2, 9, 0)
+
+    def tearDown(self):
+        self.client.drop_database(DATABASE_NAME)
+        self.client.close()
+
+    def create_bars(self, symbol: str = "rb2005", count: int = 3) -> list:
+        """"""
+        return [
+            BarData(
+                symbol=symbol,
+                exchange=Exchange.SHFE,
+                datetime=self.start + timedelta(minutes=i),
+                interval=Interval.MINUTE,
+                volume=10.0 + i,
+                open_interest=1000.0,
+                open_price=3500.0,
+                high_price=3510.0,
+                low_price=3490.0,
+                close_price=3505.0 + i,
+                gateway_name="DB",
+            )
+            for i in range(count)
+        ]
+
+    def test_save_bar_data_fast_insert(self):
+        bars = [
+            BarData(
+                symbol="rb2005",
+                exchange=Exchange.SHFE,
+                datetime=self.start + timedelta(minutes=i),
+                interval=Interval.MINUTE,
+                volume=10,
+                open_price=3500,
+                high_price=3510,
+                low_price=3490,
+                close_price=3505,
+                gateway_name="DB",
+            )
+            for i in range(3)
+        ]
+
+        self.manager.save_bar_data(bars, fast_insert=True)
+
+        loaded = self.manager.load_bar_data(
+            "rb2005",
+            Exchange.SHFE,
+            Interval.MINUTE,
+            self.start,
+            self.start + timedelta(minutes=2),
+        )
+        self.assertEqual(loaded, bars)
+
+    def test_save_tick_data_fast_insert(self):
+        ticks = [
+            TickData(
+                symbol="rb2005",
+                exchange=Exchange.SHFE,
+                datetime=self.start + timedelta(seconds=i),
+                last_price=3500,
+                bid_price_1=3499,
+                ask_price_1=3501,
+                gateway_name="DB",
+            )
+            for i in range(3)
+        ]
+
+        self.manager.save_tick_data(ticks, fast_insert=True)
+
+        loaded = self.manager.load_tick_data(
+            "rb2005",
+            Exchange.SHFE,
+            self.start,
+            self.start + timedelta(seconds=2),
+        )
+        self.assertEqual(loaded, ticks)
+
+    def test_save_tick_data_one_sided_book(self):
+        # limit down: bid side is empty while ask depth is populated
+        tick = TickData(
+            symbol="rb2005",
+            exchange=Exchange.SHFE,
+            datetime=self.start,
+            last_price=3400,
+            limit_down=3400,
+            ask_price_1=3400,
+            ask_price_2=3401,
+            ask_price_3=3402,
+            ask_price_4=3403,
+            ask_price_5=3404,
+            ask_volume_1=100,
+            ask_volume_2=20,
+            ask_volume_3=30,
+            ask_volume_4=40,
+            ask_volume_5=50,
+            gateway_name="DB",
+        )
+
+        self.manager.save_tick_data([tick])
+
+        loaded = self.manager.load_tick_data(
+            "rb2005", Exchange.SHFE, self.start, self.start
+        )
+        self.assertEqual(loaded, [tick])
+
+    def test_load_bar_data_arrays_fallback(self):
+        # integer prices and volumes are stored as BSON int32
+        bars = [
+            BarData(
+                symbol="rb2005",
+                exchange=Exchange.SHFE,
+                datetime=self.start + timedelta(minutes=i),
+                interval=Interval.MINUTE,
+                volume=10 + i,
+                open_interest=1000,
+                open_price=3500,
+                high_price=3510,
+                low_price=3490,
+                close_price=3505 + i,
+                gateway_name="DB",
+            )
+            for i in range(3)
+        ]
+        self.manager.save_bar_data(bars)
+
+        with mock.patch.object(database_mongo, "bsonnumpy", None):
+            arrays = self.manager.load_bar_data_arrays(
+                "rb2005",
+                Exchange.SHFE,
+                Interval.MINUTE,
+                self.start,
+                self.start + timedelta(minutes=2),
+            )
+            empty = self.manager.load_bar_data_arrays(
+                "rb2005",
+                Exchange.SHFE,
+                Interval.MINUTE,
+                self.start - timedelta(days=1),
+                self.start - timedelta(minutes=1),
+            )
+
+        self.assertEqual(arrays["datetime"].dtype, np.int64)
+        self.assertEqual(
+            arrays["datetime"].tolist(),
+            [int((bar.datetime - datetime(1970, 1, 1)).total_seconds() * 1000)
+             for bar in bars],
+        )
+        self.assertEqual(arrays["close_price"].dtype, np.float64)
+        self.assertEqual(arrays["close_price"].tolist(), [3505.0, 3506.0, 3507.0])
+        self.assertEqual(arrays["volume"].tolist(), [10.0, 11.0, 12.0])
+        self.assertEqual(len(empty["datetime"]), 0)
+
+    def test_load_bar_data_frame(self):
+        bars = self.create_bars()
+        self.manager.save_bar_data(bars)
+        end = self.start + timedelta(minutes=2)
+
+        df = self.manager.load_bar_data_frame(
+            "rb2005", Exchange.SHFE, Interval.MINUTE, self.start, end
+        )
+        self.assertEqual(list(df.index), [bar.datetime for bar in bars])
+        self.assertEqual(df["close_price"].tolist(), [3505.0, 3506.0, 3507.0])
+        self.assertEqual(df["volume"].dtype, np.float64)
+
+        # both ends of the range are inclusive
+        last = self.manager.load_bar_data_frame(
+            "rb2005", Exchange.SHFE, Interval.MINUTE, end, end + timedelta(days=1)
+        )
+        self.assertEqual(list(last.index), [end])
+
+        missing = self.manager.load_bar_data_frame(
+            "ag2006", Exchange.SHFE, Interval.MINUTE, self.start, end
+        )
+        self.assertTrue(missing.empty)
+        self.assertEqual(list(missing.columns), df.columns.tolist())
+
+    def test_load_bar_data_raw(self):
+        bars = self.create_bars()
+        self.manager.save_bar_data(bars)
+        end = self.start + timedelta(minutes=2)
+
+        docs = self.manager.load_bar_data_raw(
+            "rb2005", Exchange.SHFE, Interval.MINUTE, self.start, end
+        )
+        self.assertEqual([d["datetime"] for d in docs], [bar.datetime for bar in bars])
+        self.assertEqual([d["close_price"] for d in docs], [3505.0, 3506.0, 3507.0])
+
+        missing = self.manager.load_bar_data_raw(
+            "ag2006", Exchange.SHFE, Interval.MINUTE, self.start, end
+        )
+        self.assertEqual(missing, [])
+
+    def test_iter_bar_data(self):
+        bars = self.create_bars()
+        self.manager.save_bar_data(bars)
+        end = self.start + timedelta(minutes=2)
+
+        it = self.manager.iter_bar_data(
+            "rb2005", Exchange.SHFE, Interval.MINUTE, self.start, end
+        )
+        self.assertIs(iter(it), it)
+        self.assertEqual(list(it), bars)
+        # a single pass over the cursor, like any iterator
+        self.assertEqual(list(it), [])
+        self.assertEqual(
+            bars,
+            self.manager.load_bar_data(
+                "rb2005", Exchange.SHFE, Interval.MINUTE, self.start, end
+            ),
+        )
+
+        empty = self.manager.iter_bar_data(
+            "rb2005",
+            Exchange.SHFE,
+            Interval.MINUTE,
+            self.start - timedelta(days=1),
+            self.start - timedelta(minutes=1),
+        )
+        self.assertEqual(list(empty), [])
+
+    def test_load_bar_data_many(self):
+        rb_bars = self.create_bars("rb2005")
+        hc_bars = self.create_bars("hc2005", count=2)
+        self.manager.save_bar_data(rb_bars + hc_bars)
+        end = self.start + timedelta(minutes=2)
+
+        requests = [
+            ("rb2005", Exchange.SHFE, Interval.MINUTE, self.start, end),
+            ("hc2005", Exchange.SHFE, Interval.MINUTE, self.start, end),
+            ("rb2005", Exchange.SHFE, Interval.MINUTE, end, end),
+            ("ag2006", Exchange.SHFE, Interval.MINUTE, self.start, end),
+        ]
+        results = self.manager.load_bar_data_many(requests)
+
+        self.assertEqual(list(results), requests)
+        self.assertEqual(results[requests[0]], rb_bars)
+        self.assertEqual(results[requests[1]], hc_bars)
+        self.assertEqual(results[requests[2]], rb_bars[-1:])
+        self.assertEqual(results[requests[3]], [])
+
+        self.assertEqual(self.manager.load_bar_data_many([]), {})
+
+    def test_get_newest_bar_datetime(self):
+        self.assertIsNone(
+            self.manager.get_newest_bar_datetime(
+                "rb2005", Exchange.SHFE, Interval.MINUTE
+            )
+        )
+
+        bars = self.create_bars()
+        self.manager.save_bar_data(bars)
+
+        newest = self.manager.get_newest_bar_datetime(
+            "rb2005", Exchange.SHFE, Interval.MINUTE
+        )
+        self.assertEqual(newest, bars[-1].datetime)
+        self.assertEqual(
+            newest,
+            self.manager.get_newest_bar_data(
+                "rb2005", Exchange.SHFE, Interval.MINUTE
+            ).datetime,
+        )
+        self.assertIsNone(
+            self.manager.get_newest_bar_datetime(
+                "rb2005", Exchange.SHFE, Interval.HOUR
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
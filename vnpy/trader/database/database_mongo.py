@@ -1,13 +1,149 @@
+import importlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from enum import Enum
-from typing import Optional, Sequence, List
-
-from mongoengine import DateTimeField, Document, FloatField, StringField, connect
+from operator import attrgetter, itemgetter
+from typing import Dict, Iterator, Optional, Sequence, List, Set, Tuple
+
+import numpy as np
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pandas import DataFrame, to_datetime
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient, UpdateOne
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.write_concern import WriteConcern
 
 from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import BarData, TickData
 from .database import BaseDatabaseManager, Driver
 
+try:
+    import bsonnumpy
+except ImportError:
+    bsonnumpy = None
+
+BULK_WRITE_SIZE = 1000
+
+# fill a 16MB (max message size) cursor batch with bar documents,
+# which take about 200 bytes each when encoded without _id
+BAR_BATCH_SIZE = 16 * 1024 * 1024 // 200
+
+UNACKNOWLEDGED = WriteConcern(w=0)
+
+POOL_OPTIONS = (
+    "maxPoolSize",
+    "minPoolSize",
+    "maxIdleTimeMS",
+    "serverSelectionTimeoutMS",
+    "socketTimeoutMS",
+    "connectTimeoutMS",
+    "waitQueueTimeoutMS",
+)
+
+BAR_INDEXES = [
+    IndexModel(
+        [
+            ("symbol", ASCENDING),
+            ("exchange", ASCENDING),
+            ("interval", ASCENDING),
+            ("datetime", ASCENDING),
+        ],
+        unique=True,
+    )
+]
+
+TICK_INDEXES = [
+    IndexModel(
+        [
+            ("symbol", ASCENDING),
+            ("exchange", ASCENDING),
+            ("datetime", ASCENDING),
+        ],
+        unique=True,
+    )
+]
+
+# enum lookup by value, avoiding Enum call overhead per document
+EXCHANGES: Dict[str, Exchange] = {e.value: e for e in Exchange}
+INTERVALS: Dict[str, Interval] = {i.value: i for i in Interval}
+
+# fields copied as is between data objects and documents
+BAR_FIELDS = (
+    "symbol",
+    "datetime",
+    "volume",
+    "open_interest",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+)
+BAR_GETTER = attrgetter(*BAR_FIELDS)
+BAR_ITEMGETTER = itemgetter(*BAR_FIELDS)
+BAR_NEW = BarData.__new__
+
+TICK_FIELDS = (
+    "symbol",
+    "datetime",
+    "name",
+    "volume",
+    "open_interest",
+    "last_price",
+    "last_volume",
+    "limit_up",
+    "limit_down",
+    "open_price",
+    "high_price",
+    "low_price",
+    "pre_close",
+    "bid_price_1",
+    "ask_price_1",
+    "bid_volume_1",
+    "ask_volume_1",
+)
+
+TICK_DEPTH_FIELDS = tuple(
+    f"{side}_{kind}_{level}"
+    for side in ("bid", "ask")
+    for kind in ("price", "volume")
+    for level in range(2, 6)
+)
+TICK_DEPTH_ITEMGETTER = itemgetter(*TICK_DEPTH_FIELDS)
+
+# level 2-5 are always saved, a shallow book is stored as zeros
+TICK_ALL_FIELDS = TICK_FIELDS + TICK_DEPTH_FIELDS
+TICK_ALL_GETTER = attrgetter(*TICK_ALL_FIELDS)
+
+NO_ID_PROJECTION = {"_id": 0}
+DATETIME_PROJECTION = {"_id": 0, "datetime": 1}
+
+BAR_FRAME_COLUMNS = [
+    "datetime",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+    "open_interest",
+]
+# numbers are cast to double on the server, since gateways may save ints,
+# and datetime is sent as epoch milliseconds, skipping datetime decoding
+BAR_FRAME_PROJECTION = {
+    name: {"$toDouble": f"${name}"} for name in BAR_FRAME_COLUMNS[1:]
+}
+BAR_FRAME_PROJECTION["_id"] = 0
+BAR_FRAME_PROJECTION["datetime"] = {"$toLong": "$datetime"}
+
+BAR_ARRAY_DTYPE = np.dtype(
+    [("datetime", "<i8")]
+    + [(name, "<f8") for name in BAR_FRAME_COLUMNS[1:]]
+)
+
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+_clients: Dict[tuple, MongoClient] = {}
+
 
 def init(_: Driver, settings: dict):
     database = settings["database"]
@@ -17,358 +153,530 @@ def init(_: Driver, settings: dict):
     password = settings["password"]
     authentication_source = settings["authentication_source"]
 
-    if not username:  # if username == '' or None, skip username
-        username = None
-        password = None
-        authentication_source = None
-
-    connect(
-        db=database,
-        host=host,
-        port=port,
-        username=username,
-        password=password,
-        authentication_source=authentication_source,
-    )
+    kwargs = {}
+    if username:  # if username == '' or None, skip username
+        kwargs["username"] = username
+        kwargs["password"] = password
+        kwargs["authSource"] = authentication_source
 
-    return MongoManager()
+    kwargs.update(get_pool_options(settings))
 
+    compressors = get_compressors()
+    if compressors:
+        kwargs["compressors"] = compressors
 
-class DbBarData(Document):
-    """
-    Candlestick bar data for database storage.
+    client = get_client(host=host, port=port, **kwargs)
+
+    return MongoManager(client[database])
 
-    Index is defined unique with datetime, interval, symbol
+
+def get_pool_options(settings: dict) -> dict:
+    """
+    Connection pool options, sized by cpu count unless given in settings.
     """
+    cpu_count = os.cpu_count() or 1
+    options = {
+        "minPoolSize": max(4, cpu_count),
+        "maxPoolSize": max(50, 4 * cpu_count),
+    }
+    for key in POOL_OPTIONS:
+        if settings.get(key) is not None:
+            options[key] = settings[key]
+    return options
 
-    symbol: str = StringField()
-    exchange: str = StringField()
-    datetime: datetime = DateTimeField()
-    interval: str = StringField()
 
-    volume: float = FloatField()
-    open_interest: float = FloatField()
-    open_price: float = FloatField()
-    high_price: float = FloatField()
-    low_price: float = FloatField()
-    close_price: float = FloatField()
+def get_compressors() -> str:
+    """
+    Wire compressors whose python module is installed.
+    """
+    compressors = []
+    for name, module in (("zstd", "zstandard"), ("snappy", "snappy")):
+        try:
+            importlib.import_module(module)
+            compressors.append(name)
+        except ImportError:
+            pass
+    return ",".join(compressors)
 
-    meta = {
-        "indexes": [
-            {
-                "fields": ("symbol", "exchange", "interval", "datetime"),
-                "unique": True,
-            }
-        ]
+
+def get_client(**kwargs) -> MongoClient:
+    """
+    Return a MongoClient shared by all managers with the same arguments.
+    """
+    key = tuple(sorted(kwargs.items()))
+    client = _clients.get(key, None)
+    if client is None:
+        client = MongoClient(**kwargs)
+        _clients[key] = client
+    return client
+
+
+def get_bar_query(
+    symbol: str,
+    exchange: Exchange,
+    interval: Interval,
+    start: datetime,
+    end: datetime,
+) -> dict:
+    """
+    Query for bars of a symbol + exchange + interval within [start, end].
+    """
+    return {
+        "symbol": symbol,
+        "exchange": exchange.value,
+        "interval": interval.value,
+        "datetime": {"$gte": start, "$lte": end},
     }
 
-    @staticmethod
-    def from_bar(bar: BarData):
-        """
-        Generate DbBarData object from BarData.
-        """
-        db_bar = DbBarData()
-
-        db_bar.symbol = bar.symbol
-        db_bar.exchange = bar.exchange.value
-        db_bar.datetime = bar.datetime
-        db_bar.interval = bar.interval.value
-        db_bar.volume = bar.volume
-        db_bar.open_interest = bar.open_interest
-        db_bar.open_price = bar.open_price
-        db_bar.high_price = bar.high_price
-        db_bar.low_price = bar.low_price
-        db_bar.close_price = bar.close_price
-
-        return db_bar
-
-    def to_bar(self):
-        """
-        Generate BarData object from DbBarData.
-        """
-        bar = BarData(
-            symbol=self.symbol,
-            exchange=Exchange(self.exchange),
-            datetime=self.datetime,
-            interval=Interval(self.interval),
-            volume=self.volume,
-            open_interest=self.open_interest,
-            open_price=self.open_price,
-            high_price=self.high_price,
-            low_price=self.low_price,
-            close_price=self.close_price,
-            gateway_name="DB",
-        )
+
+def get_bar_frame_pipeline(query: dict) -> list:
+    """
+    Aggregation of the columns used by DataFrame and array loaders.
+    """
+    return [
+        {"$match": query},
+        {"$sort": {"datetime": ASCENDING}},
+        {"$project": BAR_FRAME_PROJECTION},
+    ]
+
+
+def from_bar(bar: BarData) -> dict:
+    """
+    Generate database document from BarData.
+    """
+    d = dict(zip(BAR_FIELDS, BAR_GETTER(bar)))
+    d["exchange"] = bar.exchange.value
+    d["interval"] = bar.interval.value
+    return d
+
+
+def check_bar_dict() -> bool:
+    """
+    Check that BarData.__init__ only stores the dataclass fields plus
+    vt_symbol, so that to_bar can fill __dict__ directly.
+    """
+    bar = BarData(
+        symbol="check",
+        exchange=Exchange.LOCAL,
+        datetime=None,
+        gateway_name="DB",
+    )
+    keys = set(BAR_FIELDS) | {"exchange", "interval", "gateway_name", "vt_symbol"}
+    return set(bar.__dict__) == keys and bar.vt_symbol == "check.LOCAL"
+
+
+FAST_TO_BAR = check_bar_dict()
+
+
+def to_bar(d: dict) -> BarData:
+    """
+    Generate BarData object from database document.
+
+    Dataclass __init__ is bypassed when it is known to be trivial,
+    which saves the argument binding cost for every row.
+    """
+    if FAST_TO_BAR:
+        exchange = EXCHANGES[d["exchange"]]
+
+        bar = BAR_NEW(BarData)
+        bar_dict = bar.__dict__
+        bar_dict.update(zip(BAR_FIELDS, BAR_ITEMGETTER(d)))
+        bar_dict["exchange"] = exchange
+        bar_dict["interval"] = INTERVALS[d["interval"]]
+        bar_dict["gateway_name"] = "DB"
+        bar_dict["vt_symbol"] = f"{d['symbol']}.{exchange.value}"
         return bar
 
+    bar = BarData(
+        symbol=d["symbol"],
+        exchange=EXCHANGES[d["exchange"]],
+        datetime=d["datetime"],
+        interval=INTERVALS[d["interval"]],
+        volume=d["volume"],
+        open_interest=d["open_interest"],
+        open_price=d["open_price"],
+        high_price=d["high_price"],
+        low_price=d["low_price"],
+        close_price=d["close_price"],
+        gateway_name="DB",
+    )
+    return bar
+
 
-class DbTickData(Document):
+def from_tick(tick: TickData) -> dict:
     """
-    Tick data for database storage.
+    Generate database document from TickData.
+    """
+    d = dict(zip(TICK_ALL_FIELDS, TICK_ALL_GETTER(tick)))
+    d["exchange"] = tick.exchange.value
+    return d
+
 
-    Index is defined unique with (datetime, symbol)
+def to_tick(d: dict) -> TickData:
+    """
+    Generate TickData object from database document.
     """
+    tick = TickData(
+        symbol=d["symbol"],
+        exchange=EXCHANGES[d["exchange"]],
+        datetime=d["datetime"],
+        name=d["name"],
+        volume=d["volume"],
+        open_interest=d["open_interest"],
+        last_price=d["last_price"],
+        last_volume=d["last_volume"],
+        limit_up=d["limit_up"],
+        limit_down=d["limit_down"],
+        open_price=d["open_price"],
+        high_price=d["high_price"],
+        low_price=d["low_price"],
+        pre_close=d["pre_close"],
+        bid_price_1=d["bid_price_1"],
+        ask_price_1=d["ask_price_1"],
+        bid_volume_1=d["bid_volume_1"],
+        ask_volume_1=d["ask_volume_1"],
+        gateway_name="DB",
+    )
 
-    symbol: str = StringField()
-    exchange: str = StringField()
-    datetime: datetime = DateTimeField()
-
-    name: str = StringField()
-    volume: float = FloatField()
-    open_interest: float = FloatField()
-    last_price: float = FloatField()
-    last_volume: float = FloatField()
-    limit_up: float = FloatField()
-    limit_down: float = FloatField()
-
-    open_price: float = FloatField()
-    high_price: float = FloatField()
-    low_price: float = FloatField()
-    close_price: float = FloatField()
-    pre_close: float = FloatField()
-
-    bid_price_1: float = FloatField()
-    bid_price_2: float = FloatField()
-    bid_price_3: float = FloatField()
-    bid_price_4: float = FloatField()
-    bid_price_5: float = FloatField()
-
-    ask_price_1: float = FloatField()
-    ask_price_2: float = FloatField()
-    ask_price_3: float = FloatField()
-    ask_price_4: float = FloatField()
-    ask_price_5: float = FloatField()
-
-    bid_volume_1: float = FloatField()
-    bid_volume_2: float = FloatField()
-    bid_volume_3: float = FloatField()
-    bid_volume_4: float = FloatField()
-    bid_volume_5: float = FloatField()
-
-    ask_volume_1: float = FloatField()
-    ask_volume_2: float = FloatField()
-    ask_volume_3: float = FloatField()
-    ask_volume_4: float = FloatField()
-    ask_volume_5: float = FloatField()
-
-    meta = {
-        "indexes": [
-            {
-                "fields": ("symbol", "exchange", "datetime"),
-                "unique": True,
-            }
-        ],
-    }
+    # documents written before level 2-5 were always saved may lack them
+    if "bid_price_2" in d:
+        tick.__dict__.update(zip(TICK_DEPTH_FIELDS, TICK_DEPTH_ITEMGETTER(d)))
 
-    @staticmethod
-    def from_tick(tick: TickData):
+    return tick
+
+
+class MongoManager(BaseDatabaseManager):
+
+    def __init__(self, db: Database):
         """
-        Generate DbTickData object from TickData.
+        Collection names are kept compatible with data written
+        by the former MongoEngine documents.
         """
-        db_tick = DbTickData()
-
-        db_tick.symbol = tick.symbol
-        db_tick.exchange = tick.exchange.value
-        db_tick.datetime = tick.datetime
-        db_tick.name = tick.name
-        db_tick.volume = tick.volume
-        db_tick.open_interest = tick.open_interest
-        db_tick.last_price = tick.last_price
-        db_tick.last_volume = tick.last_volume
-        db_tick.limit_up = tick.limit_up
-        db_tick.limit_down = tick.limit_down
-        db_tick.open_price = tick.open_price
-        db_tick.high_price = tick.high_price
-        db_tick.low_price = tick.low_price
-        db_tick.pre_close = tick.pre_close
-
-        db_tick.bid_price_1 = tick.bid_price_1
-        db_tick.ask_price_1 = tick.ask_price_1
-        db_tick.bid_volume_1 = tick.bid_volume_1
-        db_tick.ask_volume_1 = tick.ask_volume_1
-
-        if tick.bid_price_2:
-            db_tick.bid_price_2 = tick.bid_price_2
-            db_tick.bid_price_3 = tick.bid_price_3
-            db_tick.bid_price_4 = tick.bid_price_4
-            db_tick.bid_price_5 = tick.bid_price_5
-
-            db_tick.ask_price_2 = tick.ask_price_2
-            db_tick.ask_price_3 = tick.ask_price_3
-            db_tick.ask_price_4 = tick.ask_price_4
-            db_tick.ask_price_5 = tick.ask_price_5
-
-            db_tick.bid_volume_2 = tick.bid_volume_2
-            db_tick.bid_volume_3 = tick.bid_volume_3
-            db_tick.bid_volume_4 = tick.bid_volume_4
-            db_tick.bid_volume_5 = tick.bid_volume_5
-
-            db_tick.ask_volume_2 = tick.ask_volume_2
-            db_tick.ask_volume_3 = tick.ask_volume_3
-            db_tick.ask_volume_4 = tick.ask_volume_4
-            db_tick.ask_volume_5 = tick.ask_volume_5
-
-        return db_tick
-
-    def to_tick(self):
+        self.db = db
+        self.bar_collection: Collection = db["db_bar_data"]
+        self.tick_collection: Collection = db["db_tick_data"]
+
+        # handles with other options are created once and reused
+        self.bar_fast_collection: Collection = self.bar_collection.with_options(
+            write_concern=UNACKNOWLEDGED
+        )
+        self.tick_fast_collection: Collection = self.tick_collection.with_options(
+            write_concern=UNACKNOWLEDGED
+        )
+        self.bar_raw_collection: Collection = self.bar_collection.with_options(
+            codec_options=RAW_CODEC_OPTIONS
+        )
+
+        # full names of collections whose index has been ensured
+        self.indexed_collections: Set[str] = set()
+
+    def load_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> Sequence[BarData]:
+        data = list(self.iter_bar_data(symbol, exchange, interval, start, end))
+        return data
+
+    def load_bar_data_many(
+        self,
+        requests: List[Tuple[str, Exchange, Interval, datetime, datetime]],
+    ) -> Dict[tuple, List[BarData]]:
         """
-        Generate TickData object from DbTickData.
+        Load bars for many (symbol, exchange, interval, start, end) requests
+        concurrently, return a dict of request to bars.
+
+        pymongo releases the GIL while waiting on the server, and the
+        shared client pool provides a connection for each worker.
         """
-        tick = TickData(
-            symbol=self.symbol,
-            exchange=Exchange(self.exchange),
-            datetime=self.datetime,
-            name=self.name,
-            volume=self.volume,
-            open_interest=self.open_interest,
-            last_price=self.last_price,
-            last_volume=self.last_volume,
-            limit_up=self.limit_up,
-            limit_down=self.limit_down,
-            open_price=self.open_price,
-            high_price=self.high_price,
-            low_price=self.low_price,
-            pre_close=self.pre_close,
-            bid_price_1=self.bid_price_1,
-            ask_price_1=self.ask_price_1,
-            bid_volume_1=self.bid_volume_1,
-            ask_volume_1=self.ask_volume_1,
-            gateway_name="DB",
-        )
+        if not requests:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(32, len(requests))) as executor:
+            futures = {
+                req: executor.submit(self.load_bar_data, *req)
+                for req in requests
+            }
+            return {req: future.result() for req, future in futures.items()}
 
-        if self.bid_price_2:
-            tick.bid_price_2 = self.bid_price_2
-            tick.bid_price_3 = self.bid_price_3
-            tick.bid_price_4 = self.bid_price_4
-            tick.bid_price_5 = self.bid_price_5
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> Iterator[BarData]:
+        """
+        Yield bars while the cursor streams them from the server, so that
+        a long range does not have to be held in memory all at once.
+        """
+        query = get_bar_query(symbol, exchange, interval, start, end)
+        s = (
+            self.bar_collection
+            .find(query, projection=NO_ID_PROJECTION)
+            .sort("datetime", ASCENDING)
+            .batch_size(BAR_BATCH_SIZE)
+        )
+        for d in s:
+            yield to_bar(d)
 
-            tick.ask_price_2 = self.ask_price_2
-            tick.ask_price_3 = self.ask_price_3
-            tick.ask_price_4 = self.ask_price_4
-            tick.ask_price_5 = self.ask_price_5
+    def load_bar_data_frame(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> DataFrame:
+        """
+        Load bars as a DataFrame indexed by datetime, without creating
+        a BarData object for every row.
 
-            tick.bid_volume_2 = self.bid_volume_2
-            tick.bid_volume_3 = self.bid_volume_3
-            tick.bid_volume_4 = self.bid_volume_4
-            tick.bid_volume_5 = self.bid_volume_5
+        Requires MongoDB server 4.0+ for the $toLong datetime conversion.
+        """
+        query = get_bar_query(symbol, exchange, interval, start, end)
+        s = self.bar_collection.aggregate(get_bar_frame_pipeline(query))
 
-            tick.ask_volume_2 = self.ask_volume_2
-            tick.ask_volume_3 = self.ask_volume_3
-            tick.ask_volume_4 = self.ask_volume_4
-            tick.ask_volume_5 = self.ask_volume_5
+        df = DataFrame(list(s), columns=BAR_FRAME_COLUMNS)
+        df = df.astype({name: "float64" for name in BAR_FRAME_COLUMNS[1:]})
+        df["datetime"] = to_datetime(df["datetime"], unit="ms")
+        df.set_index("datetime", inplace=True)
+        return df
 
-        return tick
+    def load_bar_data_arrays(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Load bars as one numpy array per field, datetime in epoch
+        milliseconds. Raw BSON batches are decoded in C if bson-numpy
+        is installed.
 
+        Requires MongoDB server 4.0+ for the $toLong datetime conversion.
+        """
+        query = get_bar_query(symbol, exchange, interval, start, end)
+        pipeline = get_bar_frame_pipeline(query)
+
+        if bsonnumpy:
+            count = self.bar_collection.count_documents(query)
+            batches = self.bar_collection.aggregate_raw_batches(pipeline)
+            data = bsonnumpy.sequence_to_ndarray(batches, BAR_ARRAY_DTYPE, count)
+        else:
+            data = np.array(
+                [
+                    tuple(d[name] for name in BAR_FRAME_COLUMNS)
+                    for d in self.bar_collection.aggregate(pipeline)
+                ],
+                dtype=BAR_ARRAY_DTYPE,
+            )
 
-class MongoManager(BaseDatabaseManager):
+        return {name: data[name] for name in BAR_FRAME_COLUMNS}
 
-    def load_bar_data(
+    def load_bar_data_raw(
         self,
         symbol: str,
         exchange: Exchange,
         interval: Interval,
         start: datetime,
         end: datetime,
-    ) -> Sequence[BarData]:
-        s = DbBarData.objects(
-            symbol=symbol,
-            exchange=exchange.value,
-            interval=interval.value,
-            datetime__gte=start,
-            datetime__lte=end,
-        )
-        data = [db_bar.to_bar() for db_bar in s]
-        return data
+    ) -> List[RawBSONDocument]:
+        """
+        Load bars as raw BSON documents, which are only decoded when
+        a field is accessed.
+        """
+        query = get_bar_query(symbol, exchange, interval, start, end)
+        s = self.bar_raw_collection.find(query).sort("datetime", ASCENDING)
+        return list(s)
 
     def load_tick_data(
         self, symbol: str, exchange: Exchange, start: datetime, end: datetime
     ) -> Sequence[TickData]:
-        s = DbTickData.objects(
-            symbol=symbol,
-            exchange=exchange.value,
-            datetime__gte=start,
-            datetime__lte=end,
-        )
-        data = [db_tick.to_tick() for db_tick in s]
+        s = self.tick_collection.find(
+            {
+                "symbol": symbol,
+                "exchange": exchange.value,
+                "datetime": {"$gte": start, "$lte": end},
+            },
+            projection=NO_ID_PROJECTION,
+        ).sort("datetime", ASCENDING)
+        data = [to_tick(d) for d in s]
         return data
 
+    def save_bar_data(self, datas: Sequence[BarData], fast_insert: bool = False):
+        """
+        Upsert bars with bulk writes, update if exists.
+
+        With fast_insert, bars are appended with unacknowledged writes
+        instead, see fast_insert().
+        """
+        self.ensure_indexes(self.bar_collection, BAR_INDEXES)
+
+        if fast_insert:
+            documents = [from_bar(bar) for bar in datas]
+            self.fast_insert(self.bar_fast_collection, documents)
+            return
+
+        requests = []
+        for bar in datas:
+            d = from_bar(bar)
+            key = {
+                "symbol": d["symbol"],
+                "exchange": d["exchange"],
+                "interval": d["interval"],
+                "datetime": d["datetime"],
+            }
+            requests.append(UpdateOne(key, {"$set": d}, upsert=True))
+
+        self.bulk_write(self.bar_collection, requests)
+
+    def save_tick_data(self, datas: Sequence[TickData], fast_insert: bool = False):
+        """
+        Upsert ticks with bulk writes, update if exists.
+
+        With fast_insert, ticks are appended with unacknowledged writes
+        instead, see fast_insert().
+        """
+        self.ensure_indexes(self.tick_collection, TICK_INDEXES)
+
+        if fast_insert:
+            documents = [from_tick(tick) for tick in datas]
+            self.fast_insert(self.tick_fast_collection, documents)
+            return
+
+        requests = []
+        for tick in datas:
+            d = from_tick(tick)
+            key = {
+                "symbol": d["symbol"],
+                "exchange": d["exchange"],
+                "datetime": d["datetime"],
+            }
+            requests.append(UpdateOne(key, {"$set": d}, upsert=True))
+
+        self.bulk_write(self.tick_collection, requests)
+
+    def ensure_indexes(self, collection: Collection, indexes: List[IndexModel]):
+        """
+        Create indexes on first write only, instead of sending
+        create_indexes for every call.
+        """
+        if collection.full_name in self.indexed_collections:
+            return
+
+        collection.create_indexes(indexes)
+        self.indexed_collections.add(collection.full_name)
+
     @staticmethod
-    def to_update_param(d):
-        return {
-            "set__" + k: v.value if isinstance(v, Enum) else v
-            for k, v in d.__dict__.items()
-        }
-
-    def save_bar_data(self, datas: Sequence[BarData]):
-        for d in datas:
-            updates = self.to_update_param(d)
-            updates.pop("set__gateway_name")
-            updates.pop("set__vt_symbol")
-            (
-                DbBarData.objects(
-                    symbol=d.symbol, interval=d.interval.value, datetime=d.datetime
-                ).update_one(upsert=True, **updates)
-            )
+    def fast_insert(collection: Collection, documents: list):
+        """
+        Append documents to a collection with w=0 write concern, without
+        waiting for acknowledgement.
 
-    def save_tick_data(self, datas: Sequence[TickData]):
-        for d in datas:
-            updates = self.to_update_param(d)
-            updates.pop("set__gateway_name")
-            updates.pop("set__vt_symbol")
-            (
-                DbTickData.objects(
-                    symbol=d.symbol, exchange=d.exchange.value, datetime=d.datetime
-                ).update_one(upsert=True, **updates)
+        This saves one round trip per batch, but gives no durability
+        guarantee: records are lost silently if the server fails or
+        rejects them, and records which already exist are skipped by
+        the unique index rather than updated. Only use it for append-only
+        data which can be resynced, e.g. live bars and ticks.
+
+        Note that pymongo refuses bypass_document_validation together
+        with an unacknowledged write concern, so it must not be passed.
+        """
+        if not documents:
+            return
+
+        collection.insert_many(documents, ordered=False)
+
+    @staticmethod
+    def bulk_write(collection: Collection, requests: list):
+        """
+        Send requests in chunks to stay below the server command size limit.
+        """
+        for i in range(0, len(requests), BULK_WRITE_SIZE):
+            collection.bulk_write(
+                requests[i:i + BULK_WRITE_SIZE], ordered=False
             )
 
     def get_newest_bar_data(
         self, symbol: str, exchange: "Exchange", interval: "Interval"
     ) -> Optional["BarData"]:
-        s = (
-            DbBarData.objects(
-                symbol=symbol,
-                exchange=exchange.value,
-                interval=interval.value
-            )
-            .order_by("-datetime")
-            .first()
+        d = self.bar_collection.find_one(
+            {
+                "symbol": symbol,
+                "exchange": exchange.value,
+                "interval": interval.value,
+            },
+            projection=NO_ID_PROJECTION,
+            sort=[("datetime", DESCENDING)],
         )
-        if s:
-            return s.to_bar()
+        if d:
+            return to_bar(d)
+        return None
+
+    def get_newest_bar_datetime(
+        self, symbol: str, exchange: "Exchange", interval: "Interval"
+    ) -> Optional[datetime]:
+        """
+        Datetime of the newest bar, answered from the index only.
+        """
+        d = self.bar_collection.find_one(
+            {
+                "symbol": symbol,
+                "exchange": exchange.value,
+                "interval": interval.value,
+            },
+            projection=DATETIME_PROJECTION,
+            sort=[("datetime", DESCENDING)],
+        )
+        if d:
+            return d["datetime"]
         return None
 
     def get_oldest_bar_data(
         self, symbol: str, exchange: "Exchange", interval: "Interval"
     ) -> Optional["BarData"]:
-        s = (
-            DbBarData.objects(
-                symbol=symbol,
-                exchange=exchange.value,
-                interval=interval.value
-            )
-            .order_by("+datetime")
-            .first()
+        d = self.bar_collection.find_one(
+            {
+                "symbol": symbol,
+                "exchange": exchange.value,
+                "interval": interval.value,
+            },
+            projection=NO_ID_PROJECTION,
+            sort=[("datetime", ASCENDING)],
         )
-        if s:
-            return s.to_bar()
+        if d:
+            return to_bar(d)
         return None
 
     def get_newest_tick_data(
         self, symbol: str, exchange: "Exchange"
     ) -> Optional["TickData"]:
-        s = (
-            DbTickData.objects(symbol=symbol, exchange=exchange.value)
-            .order_by("-datetime")
-            .first()
+        d = self.tick_collection.find_one(
+            {"symbol": symbol, "exchange": exchange.value},
+            projection=NO_ID_PROJECTION,
+            sort=[("datetime", DESCENDING)],
         )
-        if s:
-            return s.to_tick()
+        if d:
+            return to_tick(d)
         return None
 
     def get_bar_data_statistics(self) -> List:
-        """"""
-        s = (
-            DbBarData.objects.aggregate({
+        """
+        Count bars per symbol/exchange/interval in one aggregation.
+
+        The leading $sort follows the prefix of the unique index, so the
+        group runs as a covered index scan without fetching documents.
+        """
+        s = self.bar_collection.aggregate([
+            {"$sort": {"symbol": 1, "exchange": 1, "interval": 1}},
+            {
                 "$group": {
                     "_id": {
                         "symbol": "$symbol",
@@ -377,8 +685,8 @@ class MongoManager(BaseDatabaseManager):
                     },
                     "count": {"$sum": 1}
                 }
-            })
-        )
+            }
+        ])
 
         result = []
 
@@ -398,14 +706,16 @@ class MongoManager(BaseDatabaseManager):
         """
         Delete all bar data with given symbol + exchange + interval.
         """
-        count = DbBarData.objects(
-            symbol=symbol,
-            exchange=exchange.value,
-            interval=interval.value
-        ).delete()
+        result = self.bar_collection.delete_many(
+            {
+                "symbol": symbol,
+                "exchange": exchange.value,
+                "interval": interval.value,
+            }
+        )
 
-        return count
+        return result.deleted_count
 
     def clean(self, symbol: str):
-        DbTickData.objects(symbol=symbol).delete()
-        DbBarData.objects(symbol=symbol).delete()
+        self.tick_collection.delete_many({"symbol": symbol})
+        self.bar_collection.delete_many({"symbol": symbol})